@@ -0,0 +1,116 @@
+"""
+Reclassificação de todo o database de leads
+-------------------------------------------
+• Percorre o database inteiro do Notion (com paginação)
+• Reclassifica os leads em lotes com as regras locais (ou, com --llm, pelo
+  roteador regras × LLM, que agrupa os casos ambíguos em micro‑lotes)
+• Leads em que nenhuma regra casou ficam como estão, a menos que o LLM (com
+  --llm) devolva um nível: o nível atual pode ter vindo do LLM na captação e
+  o palpite das regras não o substitui
+• Grava só os "Nível de Qualificação" que mudaram; leituras e escritas passam
+  pelo mesmo limitador de taxa (~3 req/s no Notion), com nova tentativa em 429
+
+Uso
+---
+python -m app.backfill [--dry-run] [--llm] [--batch-size 100] [--rate 3]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from . import clients, notion, routing
+from .classifier import classificar_regras
+from .config import get_settings
+
+logger = logging.getLogger("backfill")
+
+
+async def _classificar(properties: dict, usar_llm: bool) -> Optional[str]:
+    """Novo nível do lead, ou None se nem as regras nem o LLM decidiram."""
+    indicacao = notion.extract_rich_text_value(properties, "Indicação")
+    motivo = notion.extract_rich_text_value(properties, "Real Motivação")
+    nivel, confiante = classificar_regras(indicacao, motivo)
+    if confiante:
+        return nivel
+    if not (usar_llm and get_settings().openai_api_key):
+        return None
+    # Sem o fallback de `routing.classificar_lead`: se o LLM falhar, None
+    return await routing.batcher.classify(indicacao, motivo)
+
+
+async def _atualizar(page_id: str, nivel: str, limiter: clients.RateLimiter) -> bool:
+    """Grava o novo nível; em caso de 429 espera e tenta de novo."""
+    for tentativa in range(1, notion.NOTION_RETRIES + 1):
+        await limiter.wait()
+        resultado = await notion.update_page(
+            page_id, {"Nível de Qualificação": {"multi_select": [{"name": nivel}]}}
+        )
+        if resultado.get("object") != "error":
+            return True
+        logger.warning(f"Erro ao atualizar {page_id} (tentativa {tentativa}): {resultado.get('message')}")
+        if resultado.get("status") != 429:
+            return False
+        await asyncio.sleep(2 ** tentativa)
+    return False
+
+
+async def _processar_lote(lote: list, args, limiter: clients.RateLimiter, totais: dict) -> None:
+    niveis = await asyncio.gather(*(_classificar(p["properties"], args.llm) for p in lote))
+    mudancas = [
+        (page["id"], nivel)
+        for page, nivel in zip(lote, niveis)
+        if nivel is not None and nivel != routing.nivel_do_lead(page["properties"])
+    ]
+    totais["lidos"] += len(lote)
+    totais["alterados"] += len(mudancas)
+    if args.dry_run or not mudancas:
+        return
+
+    semaphore = asyncio.Semaphore(args.rate)
+
+    async def atualizar(page_id: str, nivel: str) -> bool:
+        async with semaphore:
+            return await _atualizar(page_id, nivel, limiter)
+
+    resultados = await asyncio.gather(*(atualizar(pid, nivel) for pid, nivel in mudancas))
+    totais["falhas"] += resultados.count(False)
+
+
+async def backfill(args) -> dict:
+    totais = {"lidos": 0, "alterados": 0, "falhas": 0}
+    limiter = clients.RateLimiter(args.rate)
+    lote = []
+    try:
+        async for page in notion.iter_database(limiter=limiter):
+            lote.append(page)
+            if len(lote) >= args.batch_size:
+                await _processar_lote(lote, args, limiter, totais)
+                logger.info(f"Progresso: {totais}")
+                lote = []
+        if lote:
+            await _processar_lote(lote, args, limiter, totais)
+    finally:
+        await clients.close()
+    return totais
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reclassifica todos os leads do Notion")
+    parser.add_argument("--dry-run", action="store_true", help="só conta as mudanças, sem gravar")
+    parser.add_argument("--llm", action="store_true", help="consulta o LLM nos casos ambíguos")
+    parser.add_argument("--batch-size", type=int, default=100, help="leads por lote")
+    parser.add_argument("--rate", type=int, default=3, help="escritas por segundo no Notion")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    totais = asyncio.run(backfill(args))
+    logger.info(f"Concluído: {totais}")
+
+
+if __name__ == "__main__":
+    main()
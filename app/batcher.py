@@ -0,0 +1,90 @@
+"""
+Micro‑lotes de classificação via LLM
+------------------------------------
+• Pedidos de classificação que chegam quase juntos (picos de campanha) são
+  acumulados por uma janela curta (CLASSIFY_BATCH_WINDOW_MS) ou até
+  CLASSIFY_BATCH_MAX itens
+• O lote vira uma única chamada à OpenAI que devolve um array JSON de níveis
+• Cada chamador recebe o seu resultado; se o JSON vier inválido, os itens
+  afetados são classificados um a um
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from . import chatgpt
+
+logger = logging.getLogger("batcher")
+
+
+class ClassificationBatcher:
+    """Agrupa chamadas de `classify` em lotes de até `max_items` itens."""
+
+    def __init__(self, model: str, window_ms: float = 30, max_items: int = 20):
+        self.model = model
+        self.window = window_ms / 1000
+        self.max_items = max_items
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        # Métricas: chamadas à OpenAI, itens classificados e itens reenviados sozinhos
+        self.requests = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    async def classify(self, indicacao: str, motivo: str) -> Optional[str]:
+        """Classifica um lead no próximo lote; None se o LLM não responder um nível válido."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((indicacao, motivo, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        self.items += len(batch)
+        try:
+            if len(batch) == 1:
+                indicacao, motivo, _ = batch[0]
+                self.requests += 1
+                resultados = [await chatgpt.classify_lead(indicacao, motivo, model=self.model)]
+            else:
+                self.requests += 1
+                resultados = await chatgpt.classify_leads(
+                    [(indicacao, motivo) for indicacao, motivo, _ in batch], model=self.model
+                )
+                resultados = resultados or [None] * len(batch)
+                # Itens sem nível válido no array são reenviados individualmente
+                faltando = [i for i, nivel in enumerate(resultados) if nivel is None]
+                if faltando:
+                    self.fallbacks += len(faltando)
+                    self.requests += len(faltando)
+                    individuais = await asyncio.gather(*(
+                        chatgpt.classify_lead(batch[i][0], batch[i][1], model=self.model)
+                        for i in faltando
+                    ))
+                    for i, nivel in zip(faltando, individuais):
+                        resultados[i] = nivel
+        except Exception as e:
+            logger.error(f"Falha no lote de classificação: {str(e)}")
+            resultados = [None] * len(batch)
+
+        for (_, _, future), nivel in zip(batch, resultados):
+            if not future.done():
+                future.set_result(nivel)
+
+    def snapshot(self) -> Dict:
+        return {"requisicoes": self.requests, "itens": self.items, "fallbacks": self.fallbacks}
@@ -0,0 +1,134 @@
+"""
+Agendamentos do Cal.com → Notion + WhatsApp (Z‑API)
+---------------------------------------------------
+• Recebe webhooks do Cal.com (BOOKING_CREATED/RESCHEDULED/CANCELLED) em /cal/webhook
+• Cria / atualiza a página do lead no Notion (página localizada pela réplica local)
+• Envia mensagem de confirmação no WhatsApp via Z‑API
+• Agenda lembretes para 1 hora antes da reunião (SQLite, seguro com vários workers)
+"""
+
+import asyncio
+import hmac
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, HTTPException, Request
+
+from . import notion, reminders, replica, whatsapp
+from .config import get_settings
+
+router = APIRouter(prefix="/cal", tags=["cal.com"])
+
+# Link fixo do Zoom
+ZOOM_LINK = "https://us06web.zoom.us/j/8902841864?pwd=OIjXN37C7fjELriVg4y387EbXUSVsR.1"
+
+
+# Utils ----------------------------------------------------------------
+
+def _verify_signature(raw: bytes, signature: str) -> bool:
+    """Compare hash do corpo com o header X‑Cal‑Signature‑256."""
+    digest = hmac.new(get_settings().cal_secret.encode(), raw, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(digest, signature or "")
+
+
+def _lookup_phone(email: str) -> str:
+    """Telefone do lead pelo email, consultando a réplica local do Notion.
+    Sem registro na réplica, aceita o celular no local‑part:
+    Ex.: 5511998887777@example.com → 5511998887777"""
+    phone = replica.phone_for_email(email)
+    if phone:
+        return phone
+    local = (email or "").split("@")[0]
+    return local if local.isdigit() else ""
+
+
+def _format_datetime(dt_str: str) -> str:
+    """Converte 2025-06-07T12:00:00Z → 07/06 09:00 (exemplo fuso‑3)."""
+    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00")).astimezone()
+    return dt.strftime("%d/%m %H:%M")
+
+
+# Core -----------------------------------------------------------------
+
+@router.post("/webhook")
+async def handle_webhook(request: Request):
+    """Manipula webhooks do Cal.com"""
+    try:
+        data = await request.json()
+        event_type = data.get("triggerEvent")
+        
+        if event_type not in ["BOOKING_CREATED", "BOOKING_RESCHEDULED", "BOOKING_CANCELLED"]:
+            return {"status": "ignored"}
+            
+        # Extrai dados do evento
+        event = data.get("payload", {})
+        uid = event.get("uid")
+        start_time = event.get("startTime")
+        name = event.get("attendees", [{}])[0].get("name", "")
+        email = event.get("attendees", [{}])[0].get("email", "")
+        
+        if event_type in ["BOOKING_CREATED", "BOOKING_RESCHEDULED"]:
+            # Resolve telefone e página do lead na réplica local (inclui os
+            # leads recém-criados pela captação), sem consultar o Notion
+            phone = await asyncio.to_thread(_lookup_phone, email)
+            lead = await asyncio.to_thread(replica.lead_by_phone, phone) if phone else None
+
+            # Cria/atualiza página no Notion
+            notion_response = await notion.upsert_page(
+                uid=phone or uid,
+                title=name,
+                start=start_time,
+                name=name,
+                email=email,
+                meet=ZOOM_LINK,  # Usando o link fixo do Zoom
+                page_id=lead["page_id"] if lead else None,
+            )
+            
+            # Busca dados completos do Notion para personalização
+            page_id = notion_response.get("id")
+            if page_id:
+                notion_data = await notion.get_page_properties(page_id)
+                properties = notion_data.get("properties", {})
+                
+                # Obtém o telefone do lead
+                lead_phone = notion.extract_rich_text_value(properties, "Telefone") or phone
+                
+                # Envia notificações (para o lead e para a equipe de vendas)
+                await whatsapp.notify_booking(
+                    name=name,
+                    start_time=start_time,
+                    meet_link=ZOOM_LINK,  # Usando o link fixo do Zoom
+                    notion_data=properties,
+                    lead_phone=lead_phone
+                )
+                
+                # Agenda lembrete para o lead 1 hora antes
+                if lead_phone:
+                    reminder_time = datetime.fromisoformat(start_time.replace("Z", "+00:00")) - timedelta(hours=1)
+                    if reminder_time > datetime.now(timezone.utc):
+                        await asyncio.to_thread(
+                            reminders.schedule,
+                            f"reminder_{uid}",
+                            reminder_time,
+                            name=name,
+                            start_time=start_time,
+                            meet_link=ZOOM_LINK,  # Usando o link fixo do Zoom
+                            phone=lead_phone,
+                        )
+            
+        elif event_type == "BOOKING_CANCELLED":
+            # Reunião cancelada: o lembrete não deve mais ser enviado
+            await asyncio.to_thread(reminders.cancel, f"reminder_{uid}")
+            
+        return {"status": "success"}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def status_from_trigger(trigger: str) -> str:
+    return {
+        "BOOKING_CREATED": "Agendado",
+        "BOOKING_RESCHEDULED": "Remarcado",
+        "BOOKING_CANCELLED": "Cancelado",
+    }[trigger]
@@ -0,0 +1,117 @@
+"""
+Classificação de leads por regras locais
+----------------------------------------
+• Alto  : perda de emprego, oportunidade de emprego ou viagem;
+          indicação + perda do emprego/trabalho ("perdi meu trabalho",
+          "fui demitida do emprego")
+• Médio : quer aprimorar e manter o inglês
+• Baixo : quer apenas aprimorar, sem objetivo claro
+
+As palavras‑chave ficam em tabelas por categoria (PALAVRAS_CHAVE), compiladas
+uma única vez em uma só regex: o texto é normalizado (minúsculas, sem
+acentos) e percorrido uma vez, devolvendo todas as categorias encontradas.
+Nas tabelas, `*` casa o resto da palavra ("viag*" → viagem, viagens),
+espaços casam qualquer espaçamento e `_` casa até duas palavras de ligação
+(artigo, possessivo ou preposição: "perdi _ trabalho" → "perdi o meu
+trabalho", mas não "perdi prazo no trabalho").
+
+`classificar_regras` também informa se alguma regra de fato casou: quando
+nenhuma casa, o "Baixo" devolvido é só um palpite e o roteador consulta o LLM.
+
+Variáveis de ambiente opcionais (lidas via app/config.py)
+----------------------------------------------------------
+CLASSIFIER_KEYWORDS : caminho de um JSON {"categoria": ["palavra", ...]} que
+                      substitui as tabelas padrão das categorias informadas
+"""
+
+import json
+import re
+import unicodedata
+from typing import Dict, Iterable, Set, Tuple
+
+from .config import get_settings
+
+NIVEIS = ("Alto", "Médio", "Baixo")
+
+# `_` nas tabelas: até duas palavras de ligação entre os termos
+LIGACAO = r"(?:(?:o|a|os|as|um|uma|meu|minha|seu|sua|do|da|de|no|na|em)\s+){0,2}"
+
+PALAVRAS_CHAVE: Dict[str, Iterable[str]] = {
+    # Qualquer uma destas no motivo → Alto
+    "alto": [
+        "perd* o emprego", "perd* meu emprego", "desempregad*",
+        "oportunidade* de emprego", "oportunidade* de trabalho",
+        "viag*", "viaj*", "intercambio*",
+    ],
+    # Indicação + perda do emprego → Alto
+    "perda_emprego": [
+        "perdi _ empreg*", "perdeu _ empreg*", "perdendo _ empreg*", "demitid* _ empreg*",
+        "perdi _ trabalho", "perdeu _ trabalho", "perdendo _ trabalho", "demitid* _ trabalho",
+    ],
+    "aprimorar": ["aprimor*", "aperfeico*"],
+    "manter": ["manter", "mantenh*", "manutencao"],
+}
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ("Emprêgo" → "emprego")."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+class KeywordMatcher:
+    """Uma regex com um grupo nomeado por categoria; cada texto é lido uma vez."""
+
+    def __init__(self, tabelas: Dict[str, Iterable[str]]):
+        grupos = []
+        for categoria, palavras in tabelas.items():
+            padroes = sorted({self._padrao(p) for p in palavras}, key=len, reverse=True)
+            if padroes:
+                grupos.append(f"(?P<{categoria}>{'|'.join(padroes)})")
+        self.regex = re.compile(r"\b(?:" + "|".join(grupos) + r")\b")
+
+    @staticmethod
+    def _padrao(palavra: str) -> str:
+        partes = normalizar(palavra).split()
+        padrao = ""
+        for parte in partes[:-1]:
+            padrao += LIGACAO if parte == "_" else re.escape(parte).replace(r"\*", r"\w*") + r"\s+"
+        return padrao + re.escape(partes[-1]).replace(r"\*", r"\w*")
+
+    def categorias(self, texto: str) -> Set[str]:
+        return {m.lastgroup for m in self.regex.finditer(normalizar(texto))}
+
+
+def carregar_tabelas() -> Dict[str, Iterable[str]]:
+    """Tabelas padrão, sobrescritas pelo JSON de CLASSIFIER_KEYWORDS (se houver)."""
+    tabelas = dict(PALAVRAS_CHAVE)
+    caminho = get_settings().classifier_keywords
+    if caminho:
+        with open(caminho, encoding="utf-8") as f:
+            tabelas.update(json.load(f))
+    return tabelas
+
+
+matcher = KeywordMatcher(carregar_tabelas())
+
+
+def classificar_regras(indicacao: str, motivo: str) -> Tuple[str, bool]:
+    """
+    Classifica o lead pelas regras locais.
+
+    Returns:
+        Tuple[str, bool]: (nível, confiante) — confiante=False quando nenhuma regra casou
+    """
+    encontradas = matcher.categorias(motivo)
+
+    if "alto" in encontradas:
+        return "Alto", True
+
+    if (indicacao or "").strip() and "perda_emprego" in encontradas:
+        return "Alto", True
+
+    if "aprimorar" in encontradas:
+        return ("Médio" if "manter" in encontradas else "Baixo"), True
+
+    # Sem motivo não há o que o LLM analisar
+    return "Baixo", not (motivo or "").strip()
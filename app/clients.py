@@ -0,0 +1,88 @@
+"""
+Cliente HTTP compartilhado (pool de conexões)
+---------------------------------------------
+• Um único httpx.AsyncClient para Notion, Z‑API e OpenAI: as conexões TLS
+  são reaproveitadas entre requisições em vez de abertas a cada chamada
+• Criado e fechado pelo lifespan do FastAPI (`start` / `close`)
+• `warm_up` abre as conexões antes do app se declarar pronto (/ready)
+• `RateLimiter` espaça chamadas a APIs com limite de requisições por segundo
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger("clients")
+
+# Hosts aquecidos na inicialização
+WARM_UP_URLS = [
+    "https://api.notion.com/v1/users",
+    "https://api.z-api.io/",
+    "https://api.openai.com/v1/models",
+]
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=30,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+
+
+async def start() -> httpx.AsyncClient:
+    """Cria o cliente compartilhado."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build()
+    return _client
+
+
+def get() -> httpx.AsyncClient:
+    """Retorna o cliente compartilhado (criando-o se usado fora do app, ex.: scripts)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build()
+    return _client
+
+
+async def warm_up() -> None:
+    """Abre as conexões TLS com os serviços externos. Falhas não impedem a subida."""
+
+    async def touch(url: str) -> None:
+        try:
+            # A resposta (401/404 etc.) não importa: o handshake já ficou no pool
+            await get().head(url, timeout=5)
+        except httpx.HTTPError as e:
+            logger.warning(f"Aquecimento de {url} falhou: {str(e)}")
+
+    await asyncio.gather(*(touch(url) for url in WARM_UP_URLS))
+
+
+class RateLimiter:
+    """Espaça as chamadas para no máximo `rate` por segundo."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def close() -> None:
+    """Fecha o cliente compartilhado e suas conexões."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
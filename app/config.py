@@ -0,0 +1,115 @@
+"""
+Configuração única da aplicação
+-------------------------------
+• Lida do ambiente (e do .env) uma única vez, no primeiro `get_settings()`
+• Aceita os nomes usados pelas duas apps antigas: a ponte Cal.com
+  (NOTION_TOKEN, NOTION_DB, ZAPI_INSTANCE, ZAPI_CLIENT_TOKEN) e a captação
+  de leads (NOTION_API_KEY, NOTION_DATABASE_ID, ZAPI_INSTANCE_ID,
+  ZAPI_SECURITY_TOKEN)
+• Inclui os ajustes opcionais de lembretes (REMINDERS_*), réplica
+  (REPLICA_*), modelos (OPENAI_MODEL*) e classificação (CLASSIFY_BATCH_*,
+  CLASSIFIER_KEYWORDS): scripts como `python -m app.backfill` também os
+  leem do .env
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+from dotenv import load_dotenv
+
+# Números da equipe de vendas (o primeiro pode ser trocado via ALERT_PHONE)
+DEFAULT_SALES_TEAM_PHONES = ("5511975578651", "5511957708562", "5511955911993")
+
+
+def _env(*names: str, default: str = "") -> str:
+    """Primeira variável de ambiente definida entre `names`."""
+    for name in names:
+        value = os.getenv(name)
+        if value:
+            return value
+    return default
+
+
+@dataclass(frozen=True)
+class Settings:
+    cal_secret: str
+    notion_token: str
+    notion_db: str
+    zapi_instance: str
+    zapi_token: str
+    zapi_client_token: str
+    openai_api_key: str
+    admin_phone: str
+    sales_team_phones: Tuple[str, ...]
+    drain_timeout: float
+    leads_api_token: str
+    # Lembretes (app/reminders.py)
+    reminders_db: str
+    reminders_poll_seconds: int
+    reminders_claim_ttl: int
+    reminders_max_attempts: int
+    reminders_batch_size: int
+    reminders_concurrency: int
+    reminders_rate: float
+    # Réplica local (app/replica.py)
+    replica_db: str
+    replica_sync_seconds: int
+    replica_full_sync_hours: float
+    replica_rate: float
+    # Modelos e classificação (app/routing.py, app/classifier.py)
+    classify_model: str
+    model_alto: str
+    model_medio: str
+    model_baixo: str
+    classify_batch_window_ms: float
+    classify_batch_max: int
+    classifier_keywords: str
+
+    @property
+    def zapi_configured(self) -> bool:
+        return bool(self.zapi_instance and self.zapi_token)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        load_dotenv()
+        return cls(
+            cal_secret=_env("CAL_SECRET", default="CHANGE_ME"),
+            notion_token=_env("NOTION_TOKEN", "NOTION_API_KEY"),
+            notion_db=_env("NOTION_DB", "NOTION_DATABASE_ID"),
+            zapi_instance=_env("ZAPI_INSTANCE", "ZAPI_INSTANCE_ID"),
+            zapi_token=_env("ZAPI_TOKEN"),
+            zapi_client_token=_env("ZAPI_CLIENT_TOKEN", "ZAPI_SECURITY_TOKEN"),
+            openai_api_key=_env("OPENAI_API_KEY"),
+            admin_phone=_env("ADMIN_PHONE"),
+            sales_team_phones=(
+                _env("ALERT_PHONE", default=DEFAULT_SALES_TEAM_PHONES[0]),
+                *DEFAULT_SALES_TEAM_PHONES[1:],
+            ),
+            drain_timeout=float(_env("DRAIN_TIMEOUT", default="20")),
+            leads_api_token=_env("LEADS_API_TOKEN"),
+            reminders_db=_env("REMINDERS_DB", default="reminders.db"),
+            reminders_poll_seconds=int(_env("REMINDERS_POLL_SECONDS", default="30")),
+            reminders_claim_ttl=int(_env("REMINDERS_CLAIM_TTL", default="300")),
+            reminders_max_attempts=int(_env("REMINDERS_MAX_ATTEMPTS", default="3")),
+            reminders_batch_size=int(_env("REMINDERS_BATCH_SIZE", default="500")),
+            reminders_concurrency=int(_env("REMINDERS_CONCURRENCY", default="10")),
+            reminders_rate=float(_env("REMINDERS_RATE", default="5")),
+            replica_db=_env("REPLICA_DB", default="leads.db"),
+            replica_sync_seconds=int(_env("REPLICA_SYNC_SECONDS", default="60")),
+            replica_full_sync_hours=float(_env("REPLICA_FULL_SYNC_HOURS", default="24")),
+            replica_rate=float(_env("REPLICA_RATE", default="3")),
+            classify_model=_env("OPENAI_MODEL", default="gpt-3.5-turbo"),
+            model_alto=_env("OPENAI_MODEL_ALTO", default="gpt-4"),
+            model_medio=_env("OPENAI_MODEL_MEDIO", default="gpt-3.5-turbo"),
+            model_baixo=_env("OPENAI_MODEL_BAIXO", default="gpt-3.5-turbo"),
+            classify_batch_window_ms=float(_env("CLASSIFY_BATCH_WINDOW_MS", default="30")),
+            classify_batch_max=int(_env("CLASSIFY_BATCH_MAX", default="20")),
+            classifier_keywords=_env("CLASSIFIER_KEYWORDS"),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings.from_env()
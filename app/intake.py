@@ -0,0 +1,127 @@
+"""
+Captação de leads (formulário → Notion + alerta WhatsApp)
+---------------------------------------------------------
+• Recebe os dados do formulário em /intake/webhook
+• Classifica o lead (regras locais; LLM só nos casos ambíguos)
+• Cria a página no Notion e a grava na réplica local, para que o webhook do
+  Cal.com encontre o lead sem consultar o Notion
+• Leads "Alto" geram um alerta no WhatsApp para a equipe de vendas
+"""
+
+import asyncio
+import logging
+import time
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from . import chatgpt, notion, replica, routing, whatsapp
+from .config import get_settings
+
+logger = logging.getLogger("intake")
+
+router = APIRouter(prefix="/intake", tags=["intake"])
+
+
+# ───────────────────────────────────────────────────────────────────────
+# 1) TEXTO PARA LEADS “ALTO”
+# ───────────────────────────────────────────────────────────────────────
+async def gerar_mensagem_alto(**info) -> str:
+    inicio = time.perf_counter()
+    if get_settings().openai_api_key:
+        modelo = routing.modelo_para_nivel("Alto")
+        mensagem = await chatgpt.generate_high_lead_message(info, model=modelo)
+        if mensagem:
+            routing.stats.record("resumo", f"llm:{modelo}", inicio)
+            return mensagem
+
+    partes = ["Lead com alta chance de fechar negócio!"]
+    for k, v in info.items():
+        if v:
+            partes.append(f"{k.capitalize()}: {v}")
+    routing.stats.record("resumo", "mensagem padrão (fallback)", inicio)
+    return "\n".join(partes)
+
+
+async def alertar_equipe(mensagem: str) -> None:
+    """Envia o alerta para a equipe de vendas; falhas de envio não interrompem o fluxo."""
+    settings = get_settings()
+    if not settings.zapi_configured:
+        logger.info("Z-API não configurada; mensagem não enviada.")
+        return
+
+    async def enviar(phone: str) -> None:
+        try:
+            await whatsapp.send_message(phone, mensagem)
+        except Exception as exc:
+            logger.warning(f"Erro ao enviar WhatsApp para {phone}: {exc}")
+
+    await asyncio.gather(*(enviar(phone) for phone in settings.sales_team_phones))
+
+
+# ───────────────────────────────────────────────────────────────────────
+# 2) ROTA
+# ───────────────────────────────────────────────────────────────────────
+@router.post("/webhook")
+async def webhook(request: Request):
+    data = await request.json()
+
+    # ─── Dados recebidos ──────────────────────────────────────────────
+    nome            = data.get("nome")
+    email           = data.get("email")          # opcional
+    whatsapp_numero = data.get("whatsapp")
+    profissao       = data.get("profissao")
+    indicacao       = data.get("indicacao")
+    motivo          = data.get("motivo")
+    historico       = data.get("historico")
+    disponibilidade = data.get("disponibilidade")
+    idade           = data.get("idade")
+
+    if not (nome and whatsapp_numero):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Nome ou WhatsApp faltando."},
+        )
+
+    nivel = await routing.classificar_lead(indicacao, motivo)
+
+    # ─── Monta propriedades do Notion ────────────────────────────────
+    properties = {
+        "Cliente":               {"title":      [{"text": {"content": nome}}]},
+        "Telefone":              {"rich_text":  [{"text": {"content": whatsapp_numero}}]},
+        "Profissão":             {"rich_text":  [{"text": {"content": profissao or ""}}]},
+        "Indicação":             {"rich_text":  [{"text": {"content": indicacao or ""}}]},
+        "Idade":                 {"rich_text":  [{"text": {"content": str(idade or "")}}]},
+        "Histórico Inglês":      {"rich_text":  [{"text": {"content": historico or ""}}]},
+        "Disponibilidade Horário":{"rich_text": [{"text": {"content": disponibilidade or ""}}]},
+        "Real Motivação":        {"rich_text":  [{"text": {"content": motivo or ""}}]},
+        "Nível de Qualificação": {"multi_select": [{"name": nivel}]},
+    }
+    if email:
+        properties["Email"] = {"email": email}
+
+    notion_page = await notion.create_page(properties)
+    if notion_page.get("object") == "page":
+        await asyncio.to_thread(replica.store_page, notion_page)
+
+    # ─── Lead “Alto” → alerta WhatsApp ───────────────────────────────
+    if nivel == "Alto":
+        mensagem = await gerar_mensagem_alto(
+            nome=nome,
+            email=email,
+            whatsapp=whatsapp_numero,
+            idade=idade,
+            profissao=profissao,
+            motivo=motivo,
+            historico=historico,
+        )
+        await alertar_equipe(mensagem)
+
+    # ─── Resposta final ──────────────────────────────────────────────
+    if notion_page.get("object") == "page":
+        return {"message": "Dados enviados para o Notion com sucesso."}
+
+    return JSONResponse(
+        status_code=notion_page.get("status", 500),
+        content={"error": notion_page.get("text", notion_page)},
+    )
@@ -1,158 +1,167 @@
 """
-FastAPI bridge: Cal.com → Notion + WhatsApp (Z‑API)
-----------------------------------------------------
-• Recebe webhooks do Cal.com (BOOKING_CREATED/RESCHEDULED/CANCELLED)
-• Valida assinatura HMAC (X‑Cal‑Signature‑256)
-• Cria / atualiza página em um banco do Notion
-• Envia mensagem de confirmação no WhatsApp via Z‑API
-• Agenda lembretes para 1 hora antes da reunião
+Agente de vendas: Cal.com + captação de leads → Notion + WhatsApp (Z‑API)
+------------------------------------------------------------------------
+Uma única aplicação FastAPI, com configuração (app/config.py), pool HTTP
+(app/clients.py) e réplica local do Notion (app/replica.py) compartilhados:
+
+• /cal/webhook     : agendamentos do Cal.com (app/booking.py)
+• /intake/webhook  : formulário de captação de leads (app/intake.py)
+• /webhook         : compatibilidade com as duas apps antigas — payloads com
+                     `triggerEvent` vão para o Cal.com, os demais para a captação
+• Recursos (scheduler, pool HTTP, OpenAI) criados no lifespan; /ready indica
+  quando as conexões já foram aquecidas
+• Réplica local (SQLite) do database de leads: resolve o telefone do lead
+  e atende a busca em /leads sem consultar o Notion
 
 Variáveis de ambiente exigidas
 -----------------------------
 CAL_SECRET        : mesmo secret definido no webhook Cal.com
-NOTION_TOKEN      : token de integração (Bearer) da Notion
-NOTION_DB         : database_id onde serão criadas as páginas
-ZAPI_INSTANCE     : id da instância Z‑API
+NOTION_TOKEN      : token de integração (Bearer) da Notion (ou NOTION_API_KEY)
+NOTION_DB         : database_id onde serão criadas as páginas (ou NOTION_DATABASE_ID)
+ZAPI_INSTANCE     : id da instância Z‑API (ou ZAPI_INSTANCE_ID)
 ZAPI_TOKEN        : token da instância Z‑API
+ZAPI_CLIENT_TOKEN : Client-Token da Z‑API (ou ZAPI_SECURITY_TOKEN)
+OPENAI_API_KEY    : chave da OpenAI
 ADMIN_PHONE      : seu número de telefone para receber notificações
+ALERT_PHONE       : substitui o primeiro número da equipe de vendas
 PORT              : porta que o Uvicorn vai expor (padrão 8000)
+DRAIN_TIMEOUT     : segundos para concluir envios em andamento no shutdown (padrão 20)
+LEADS_API_TOKEN   : habilita /leads, exigindo o mesmo valor no header X-API-Key
 """
 
+import asyncio
 import hmac
-import hashlib
-import json
+import logging
 import os
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
-import httpx
-from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Request
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.date import DateTrigger
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.responses import JSONResponse
 
-from . import notion, whatsapp
+from . import booking, chatgpt, clients, intake, reminders, replica, routing
+from .config import get_settings
 
-# --- Config -----------------------------------------------------------
-CAL_SECRET = os.getenv("CAL_SECRET", "CHANGE_ME")
-NOTION_TOKEN = os.getenv("NOTION_TOKEN", "")
-NOTION_DB = os.getenv("NOTION_DB", "")
-ZAPI_INSTANCE = os.getenv("ZAPI_INSTANCE", "")
-ZAPI_TOKEN = os.getenv("ZAPI_TOKEN", "")
-ADMIN_PHONE = os.getenv("ADMIN_PHONE", "")
 
-NOTION_HEADERS = {
-    "Authorization": f"Bearer {NOTION_TOKEN}",
-    "Notion-Version": "2022-06-28",
-    "Content-Type": "application/json",
-}
+# Lifespan -------------------------------------------------------------
 
-# Inicializa o scheduler para os lembretes
-scheduler = AsyncIOScheduler()
-scheduler.start()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Sobe scheduler e conexões antes de aceitar tráfego; drena tudo no shutdown."""
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    settings = get_settings()
+    app.state.ready = False
+    await asyncio.to_thread(reminders.init_db)
+    await asyncio.to_thread(replica.init_db)
+    await clients.start()
+
+    # Aquece TLS (Notion, Z‑API, OpenAI) e carrega o SDK da OpenAI fora do loop
+    await asyncio.gather(clients.warm_up(), asyncio.to_thread(chatgpt.get_client))
+
+    # Cada worker apenas varre a tabela de lembretes; o claim atômico
+    # garante um único envio por lembrete.
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        reminders.dispatch_due,
+        trigger=IntervalTrigger(seconds=settings.reminders_poll_seconds),
+        id="reminders_dispatch",
+        max_instances=1,
+        coalesce=True,
+    )
+    # Sincroniza a réplica logo na subida (em segundo plano) e depois periodicamente
+    scheduler.add_job(
+        replica.sync,
+        trigger=IntervalTrigger(seconds=settings.replica_sync_seconds),
+        id="replica_sync",
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True,
+    )
+    # Varredura completa periódica: remove da réplica as páginas arquivadas
+    scheduler.add_job(
+        replica.sync,
+        trigger=IntervalTrigger(hours=settings.replica_full_sync_hours),
+        kwargs={"full": True},
+        id="replica_full_sync",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    app.state.ready = True
+
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        # O shutdown do scheduler cancela os jobs em execução: primeiro
+        # pausa os disparos e drena o lote de lembretes em andamento
+        scheduler.pause()
+        await reminders.drain(timeout=settings.drain_timeout)
+        scheduler.shutdown(wait=False)
+        await clients.close()
 
-# Link fixo do Zoom
-ZOOM_LINK = "https://us06web.zoom.us/j/8902841864?pwd=OIjXN37C7fjELriVg4y387EbXUSVsR.1"
 
 # ---------------------------------------------------------------------
-app = FastAPI(title="Cal.com → Notion + WhatsApp bridge")
+app = FastAPI(title="Agente de vendas: Cal.com + captação → Notion + WhatsApp", lifespan=lifespan)
+app.include_router(booking.router)
+app.include_router(intake.router)
 
 
-# Utils ----------------------------------------------------------------
+# Core -----------------------------------------------------------------
 
-def _verify_signature(raw: bytes, signature: str) -> bool:
-    """Compare hash do corpo com o header X‑Cal‑Signature‑256."""
-    digest = hmac.new(CAL_SECRET.encode(), raw, hashlib.sha256).hexdigest()
-    return hmac.compare_digest(digest, signature or "")
+@app.get("/")
+async def root():
+    return {"message": "API is running"}
 
 
-def _lookup_phone(email: str) -> str:
-    """Exemplo simples: supõe que o usuário colocou celular no local‑part.
-    Ex.: [5511998887777]@example.com → +5511998887777
-    Ajuste para sua realidade (Notion / CRM / regex etc.)."""
-    local = email.split("@")[0]
-    return f"+{local}" if local.isdigit() else "+0000000000"
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 só depois do aquecimento e antes do shutdown."""
+    if getattr(app.state, "ready", False):
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "starting"})
 
 
-def _format_datetime(dt_str: str) -> str:
-    """Converte 2025-06-07T12:00:00Z → 07/06 09:00 (exemplo fuso‑3)."""
-    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00")).astimezone()
-    return dt.strftime("%d/%m %H:%M")
+@app.get("/leads")
+async def search_leads(
+    q: str = "",
+    status: str = "",
+    limit: int = Query(50, ge=1, le=500),
+    x_api_key: str = Header(""),
+):
+    """
+    Busca leads na réplica local (nome, email, telefone, profissão, motivação).
 
+    Expõe dados pessoais: desabilitada (404) sem LEADS_API_TOKEN e, com ele,
+    exige o mesmo valor no header X-API-Key.
+    """
+    token = get_settings().leads_api_token
+    if not token:
+        return JSONResponse(status_code=404, content={"error": "Busca de leads desabilitada."})
+    if not hmac.compare_digest(x_api_key.encode(), token.encode()):
+        return JSONResponse(status_code=401, content={"error": "X-API-Key inválida."})
+    return await asyncio.to_thread(replica.search, q, status, limit)
+
+
+@app.get("/routing/stats")
+async def routing_stats():
+    """Decisões de roteamento regras × LLM (contagem e latência por rota)."""
+    return routing.stats.snapshot()
 
-# Core -----------------------------------------------------------------
 
 @app.post("/webhook")
-async def handle_webhook(request: Request):
-    """Manipula webhooks do Cal.com"""
-    try:
-        data = await request.json()
-        event_type = data.get("triggerEvent")
-        
-        if event_type not in ["BOOKING_CREATED", "BOOKING_RESCHEDULED", "BOOKING_CANCELLED"]:
-            return {"status": "ignored"}
-            
-        # Extrai dados do evento
-        event = data.get("payload", {})
-        uid = event.get("uid")
-        start_time = event.get("startTime")
-        name = event.get("attendees", [{}])[0].get("name", "")
-        email = event.get("attendees", [{}])[0].get("email", "")
-        
-        if event_type in ["BOOKING_CREATED", "BOOKING_RESCHEDULED"]:
-            # Cria/atualiza página no Notion
-            notion_response = await notion.upsert_page(
-                uid=uid,
-                title=name,
-                start=start_time,
-                name=name,
-                email=email,
-                meet=ZOOM_LINK  # Usando o link fixo do Zoom
-            )
-            
-            # Busca dados completos do Notion para personalização
-            page_id = notion_response.get("id")
-            if page_id:
-                notion_data = await notion.get_page_properties(page_id)
-                properties = notion_data.get("properties", {})
-                
-                # Obtém o telefone do lead
-                lead_phone = notion.extract_rich_text_value(properties, "Telefone")
-                
-                # Envia notificações (para o lead e para a equipe de vendas)
-                await whatsapp.notify_booking(
-                    name=name,
-                    start_time=start_time,
-                    meet_link=ZOOM_LINK,  # Usando o link fixo do Zoom
-                    notion_data=properties,
-                    lead_phone=lead_phone
-                )
-                
-                # Agenda lembrete para o lead 1 hora antes
-                if lead_phone:
-                    reminder_time = datetime.fromisoformat(start_time.replace("Z", "+00:00")) - timedelta(hours=1)
-                    if reminder_time > datetime.now():
-                        scheduler.add_job(
-                            whatsapp.send_reminder,
-                            trigger=DateTrigger(run_date=reminder_time),
-                            args=[name, start_time, ZOOM_LINK, lead_phone],  # Usando o link fixo do Zoom
-                            id=f"reminder_{uid}"
-                        )
-            
-        elif event_type == "BOOKING_CANCELLED":
-            # TODO: Implementar lógica para cancelamento
-            pass
-            
-        return {"status": "success"}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-def status_from_trigger(trigger: str) -> str:
-    return {
-        "BOOKING_CREATED": "Agendado",
-        "BOOKING_RESCHEDULED": "Remarcado",
-        "BOOKING_CANCELLED": "Cancelado",
-    }[trigger]
+async def webhook(request: Request):
+    """Compatibilidade: webhook único das apps antigas (Cal.com ou captação)."""
+    data = await request.json()
+    if "triggerEvent" in data:
+        return await booking.handle_webhook(request)
+    return await intake.webhook(request)
 
 
 # --- Entrypoint -------------------------------------------------------
@@ -160,7 +169,7 @@ if __name__ == "__main__":
     import uvicorn
 
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host="0.0.0.0",
         port=int(os.getenv("PORT", 8000)),
         reload=True,
@@ -1,58 +1,109 @@
-import os, httpx
+import asyncio
+import time
 from datetime import datetime
 
-TOKEN = os.getenv("NOTION_TOKEN")
-DB_ID = os.getenv("NOTION_DB")
-HEADERS = {
-    "Authorization": f"Bearer {TOKEN}",
-    "Content-Type": "application/json",
-    "Notion-Version": "2022-06-28"
-}
+from . import clients
+from .config import get_settings
+
+NOTION_TIMEOUT = 10
+NOTION_RETRIES = 3
+
+# Schema do database muda raramente: cacheado para não buscá-lo a cada página criada
+SCHEMA_TTL = 300
+_schema_cache = {"properties": None, "expira": 0.0}
+
+def _db_id() -> str:
+    return get_settings().notion_db
+
+def _headers() -> dict:
+    """Cabeçalhos da API do Notion"""
+    return {
+        "Authorization": f"Bearer {get_settings().notion_token}",
+        "Content-Type": "application/json",
+        "Notion-Version": "2022-06-28"
+    }
 
 async def get_database_properties():
-    """Busca todas as propriedades do database do Notion"""
-    async with httpx.AsyncClient(timeout=10) as c:
-        response = await c.get(
-            f"https://api.notion.com/v1/databases/{DB_ID}",
-            headers=HEADERS
-        )
-        if response.status_code == 200:
-            return response.json().get("properties", {})
-        return None
+    """Busca todas as propriedades do database do Notion (cache de SCHEMA_TTL segundos)"""
+    if _schema_cache["properties"] and _schema_cache["expira"] > time.monotonic():
+        return _schema_cache["properties"]
+    c = clients.get()
+    response = await c.get(
+        f"https://api.notion.com/v1/databases/{_db_id()}",
+        headers=_headers(),
+        timeout=NOTION_TIMEOUT
+    )
+    if response.status_code == 200:
+        _schema_cache["properties"] = response.json().get("properties", {})
+        _schema_cache["expira"] = time.monotonic() + SCHEMA_TTL
+        return _schema_cache["properties"]
+    return None
 
 async def get_page_properties(page_id: str):
     """Busca todas as propriedades de uma página do Notion"""
-    async with httpx.AsyncClient(timeout=10) as c:
-        response = await c.get(
-            f"https://api.notion.com/v1/pages/{page_id}",
-            headers=HEADERS
-        )
-        return response.json()
+    c = clients.get()
+    response = await c.get(
+        f"https://api.notion.com/v1/pages/{page_id}",
+        headers=_headers(),
+        timeout=NOTION_TIMEOUT
+    )
+    return response.json()
 
 async def update_page(page_id: str, properties: dict):
     """Atualiza uma página no Notion."""
     body = {"properties": properties}
-    async with httpx.AsyncClient(timeout=10) as c:
-        response = await c.patch(
-            f"https://api.notion.com/v1/pages/{page_id}",
-            json=body,
-            headers=HEADERS
-        )
-        return response.json()
-
-async def upsert_page(uid, title, start, name, email, meet):
-    """Cria ou atualiza uma página no Notion"""
+    c = clients.get()
+    response = await c.patch(
+        f"https://api.notion.com/v1/pages/{page_id}",
+        json=body,
+        headers=_headers(),
+        timeout=NOTION_TIMEOUT
+    )
+    return response.json()
+
+async def create_page(properties: dict):
+    """
+    Cria uma página no database do Notion.
+
+    Em caso de erro devolve {"object": "error", "status": ..., ...}; se o
+    corpo não for JSON (ex.: página HTML de um 502), o texto vai em "text".
+    """
+    body = {
+        "parent": {"database_id": _db_id()},
+        "properties": properties
+    }
+    c = clients.get()
+    response = await c.post(
+        "https://api.notion.com/v1/pages",
+        json=body,
+        headers=_headers(),
+        timeout=NOTION_TIMEOUT
+    )
+    try:
+        resultado = response.json()
+    except ValueError:
+        status = response.status_code if response.is_error else 502
+        return {"object": "error", "status": status, "text": response.text}
+    if response.is_error:
+        resultado.setdefault("object", "error")
+        resultado.setdefault("status", response.status_code)
+    return resultado
+
+async def upsert_page(uid, title, start, name, email, meet, page_id=None):
+    """Cria ou atualiza uma página no Notion (page_id evita a busca por telefone)"""
     # Converte a data UTC para objeto datetime
     dt = datetime.fromisoformat(start.replace("Z", "+00:00"))
     # Formata a data no padrão brasileiro
     formatted_date = dt.strftime("%d-%m-%Y às %H:%M")
 
-    # Busca por uma página existente com o número de telefone (uid)
-    search_results = await query_database(filter_property="Telefone", filter_value=uid)
-    
-    if search_results and search_results.get("results"):
+    if not page_id:
+        # Busca por uma página existente com o número de telefone (uid)
+        search_results = await query_database(filter_property="Telefone", filter_value=uid)
+        if search_results and search_results.get("results"):
+            page_id = search_results["results"][0]["id"]
+
+    if page_id:
         # Página encontrada, vamos atualizá-la
-        page_id = search_results["results"][0]["id"]
         properties_to_update = {
             "Status": {"select": {"name": "Agendado reunião"}},
             "Email": {"email": email},
@@ -92,18 +143,7 @@ async def upsert_page(uid, title, start, name, email, meet):
                 properties[prop_name] = {"number": None}
             # Adicione outros tipos conforme necessário
     
-    body = {
-        "parent": {"database_id": DB_ID},
-        "properties": properties
-    }
-    
-    async with httpx.AsyncClient(timeout=10) as c:
-        response = await c.post(
-            "https://api.notion.com/v1/pages",
-            json=body,
-            headers=HEADERS
-        )
-        return response.json()
+    return await create_page(properties)
 
 async def query_database(filter_property: str, filter_value: str):
     """Busca páginas no banco de dados do Notion com um filtro específico"""
@@ -116,13 +156,47 @@ async def query_database(filter_property: str, filter_value: str):
         }
     }
     
-    async with httpx.AsyncClient(timeout=10) as c:
-        response = await c.post(
-            f"https://api.notion.com/v1/databases/{DB_ID}/query",
-            json=body,
-            headers=HEADERS
-        )
-        return response.json()
+    c = clients.get()
+    response = await c.post(
+        f"https://api.notion.com/v1/databases/{_db_id()}/query",
+        json=body,
+        headers=_headers(),
+        timeout=NOTION_TIMEOUT
+    )
+    return response.json()
+
+async def iter_database(filter: dict = None, page_size: int = 100, limiter: clients.RateLimiter = None,
+                        sorts: list = None):
+    """Percorre todas as páginas do database, seguindo a paginação (next_cursor).
+
+    Cada leitura passa pelo `limiter` (se informado) e, em caso de 429, espera
+    o Retry-After e tenta de novo até NOTION_RETRIES vezes."""
+    body = {"page_size": page_size}
+    if filter:
+        body["filter"] = filter
+    if sorts:
+        body["sorts"] = sorts
+    c = clients.get()
+    while True:
+        for tentativa in range(1, NOTION_RETRIES + 1):
+            if limiter:
+                await limiter.wait()
+            response = await c.post(
+                f"https://api.notion.com/v1/databases/{_db_id()}/query",
+                json=body,
+                headers=_headers(),
+                timeout=NOTION_TIMEOUT
+            )
+            if response.status_code != 429 or tentativa == NOTION_RETRIES:
+                break
+            await asyncio.sleep(float(response.headers.get("Retry-After", 2 ** tentativa)))
+        response.raise_for_status()
+        data = response.json()
+        for page in data.get("results", []):
+            yield page
+        if not data.get("has_more"):
+            break
+        body["start_cursor"] = data["next_cursor"]
 
 def extract_rich_text_value(properties: dict, property_name: str) -> str:
     """Extrai o valor de uma propriedade rich_text do Notion"""
@@ -0,0 +1,254 @@
+"""
+Lembretes persistidos em SQLite com claim atômico
+-------------------------------------------------
+• Cada lembrete vira uma linha na tabela `reminders` (id, horário, payload)
+• Todos os workers consultam a tabela periodicamente (`dispatch_due`)
+• Um lembrete vencido só é enviado pelo worker que conseguir "reivindicá-lo"
+  dentro de uma transação `BEGIN IMMEDIATE` — os demais não o enxergam mais
+• Claims presos (worker morreu no meio do envio) expiram após CLAIM_TTL
+• A cada tick o worker acorda uma vez, reivindica os vencidos em lotes de
+  BATCH_SIZE (índice parcial em run_at) e os envia concorrentemente, com
+  limite de concorrência e de envios por segundo para não estourar a Z-API
+
+Variáveis de ambiente opcionais (lidas via app/config.py)
+----------------------------------------------------------
+REMINDERS_DB            : caminho do arquivo SQLite (padrão reminders.db)
+REMINDERS_POLL_SECONDS  : intervalo de varredura dos lembretes (padrão 30)
+REMINDERS_CLAIM_TTL     : segundos até um claim ser considerado abandonado (padrão 300)
+REMINDERS_MAX_ATTEMPTS  : tentativas antes de marcar o lembrete como falho (padrão 3)
+REMINDERS_BATCH_SIZE    : lembretes reivindicados por transação (padrão 500)
+REMINDERS_CONCURRENCY   : envios simultâneos por worker (padrão 10)
+REMINDERS_RATE          : envios por segundo por worker (padrão 5)
+
+Obs.: o SQLite só coordena processos que enxergam o mesmo arquivo, ou seja,
+vários workers em uma única instância. No Render o arquivo fica no disco
+persistente (ver render.yaml), que não é compartilhado entre instâncias:
+o serviço deve rodar com uma instância só. Sem o disco, cada deploy apaga
+os lembretes pendentes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+
+from . import clients, whatsapp
+from .config import get_settings
+
+logger = logging.getLogger("reminders")
+
+# Identifica quem reivindicou cada lembrete (útil para depuração)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Ticks em andamento e sinal de encerramento (ver `drain`)
+_inflight = set()
+_draining = False
+
+
+def _connect() -> sqlite3.Connection:
+    """Abre uma conexão em modo autocommit (as transações são explícitas)."""
+    conn = sqlite3.connect(get_settings().reminders_db, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def init_db() -> None:
+    """Cria a tabela de lembretes, se ainda não existir."""
+    with closing(_connect()) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reminders (
+                id          TEXT PRIMARY KEY,
+                run_at      REAL NOT NULL,
+                payload     TEXT NOT NULL,
+                status      TEXT NOT NULL DEFAULT 'pending',
+                claimed_by  TEXT,
+                claimed_at  REAL,
+                attempts    INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Índice parcial: só os pendentes, ordenados por horário (funciona como
+        # a fila de prioridade do dispatcher, sem carregar nada em memória)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reminders_pending "
+            "ON reminders (run_at) WHERE status = 'pending'"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reminders_claimed "
+            "ON reminders (claimed_at) WHERE status = 'claimed'"
+        )
+
+
+def schedule(reminder_id: str, run_at: datetime, **payload) -> None:
+    """Agenda (ou reagenda) um lembrete. O payload vira kwargs de `send_reminder`."""
+    with closing(_connect()) as conn:
+        conn.execute(
+            """
+            INSERT INTO reminders (id, run_at, payload) VALUES (?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                run_at = excluded.run_at,
+                payload = excluded.payload,
+                status = 'pending',
+                claimed_by = NULL,
+                claimed_at = NULL,
+                attempts = 0
+            """,
+            (reminder_id, run_at.timestamp(), json.dumps(payload, separators=(",", ":"))),
+        )
+    logger.info(f"Lembrete {reminder_id} agendado para {run_at.isoformat()}")
+
+
+def cancel(reminder_id: str) -> None:
+    """Remove um lembrete pendente."""
+    with closing(_connect()) as conn:
+        conn.execute(
+            "DELETE FROM reminders WHERE id = ? AND status = 'pending'", (reminder_id,)
+        )
+
+
+def claim_due(now: float = None, limit: int = None) -> list:
+    """
+    Reivindica atomicamente até `limit` lembretes vencidos para este worker.
+
+    Returns:
+        list: Tuplas (id, payload) que somente este worker deve enviar
+    """
+    settings = get_settings()
+    now = now or time.time()
+    limit = limit or settings.reminders_batch_size
+    ttl, max_attempts = settings.reminders_claim_ttl, settings.reminders_max_attempts
+    conn = _connect()
+    try:
+        # BEGIN IMMEDIATE trava a escrita: dois workers nunca pegam a mesma linha
+        conn.execute("BEGIN IMMEDIATE")
+        # Claims abandonados que já esgotaram as tentativas viram falha definitiva
+        conn.execute(
+            """
+            UPDATE reminders
+            SET status = 'failed', claimed_by = NULL, claimed_at = NULL
+            WHERE status = 'claimed' AND claimed_at <= ? AND attempts >= ?
+            """,
+            (now - ttl, max_attempts),
+        )
+        rows = conn.execute(
+            """
+            SELECT id, payload FROM (
+                SELECT id, payload, run_at FROM reminders
+                WHERE status = 'pending' AND run_at <= ?
+                UNION ALL
+                SELECT id, payload, run_at FROM reminders
+                WHERE status = 'claimed' AND claimed_at <= ? AND attempts < ?
+            )
+            ORDER BY run_at
+            LIMIT ?
+            """,
+            (now, now - ttl, max_attempts, limit),
+        ).fetchall()
+        conn.executemany(
+            """
+            UPDATE reminders
+            SET status = 'claimed', claimed_by = ?, claimed_at = ?, attempts = attempts + 1
+            WHERE id = ?
+            """,
+            [(WORKER_ID, now, row["id"]) for row in rows],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return [(row["id"], json.loads(row["payload"])) for row in rows]
+
+
+def mark_done(reminder_ids: list) -> None:
+    """Remove os lembretes enviados."""
+    with closing(_connect()) as conn:
+        conn.executemany(
+            "DELETE FROM reminders WHERE id = ? AND claimed_by = ?",
+            [(reminder_id, WORKER_ID) for reminder_id in reminder_ids],
+        )
+
+
+def mark_failed(reminder_ids: list) -> None:
+    """Devolve os lembretes à fila ou os marca como falhos após MAX_ATTEMPTS."""
+    settings = get_settings()
+    retry_at = time.time() + settings.reminders_poll_seconds
+    with closing(_connect()) as conn:
+        conn.executemany(
+            """
+            UPDATE reminders
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                run_at = ?, claimed_by = NULL, claimed_at = NULL
+            WHERE id = ? AND claimed_by = ?
+            """,
+            # Nova tentativa só no próximo tick
+            [(settings.reminders_max_attempts, retry_at, reminder_id, WORKER_ID) for reminder_id in reminder_ids],
+        )
+
+
+async def _send_batch(claimed: list) -> None:
+    """
+    Envia um lote concorrentemente, gravando o resultado de cada envio logo
+    após ele: se o lote for interrompido, só os envios em andamento (no
+    máximo CONCURRENCY) podem ser repetidos após CLAIM_TTL.
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(settings.reminders_concurrency)
+    limiter = clients.RateLimiter(settings.reminders_rate)
+    done, failed = [], []
+
+    async def send(reminder_id: str, payload: dict) -> None:
+        async with semaphore:
+            await limiter.wait()
+            try:
+                await whatsapp.send_reminder(**payload)
+            except Exception as e:
+                logger.error(f"Falha ao enviar lembrete {reminder_id}: {str(e)}")
+                failed.append(reminder_id)
+                await asyncio.to_thread(mark_failed, [reminder_id])
+            else:
+                done.append(reminder_id)
+                await asyncio.to_thread(mark_done, [reminder_id])
+
+    await asyncio.gather(*(send(reminder_id, payload) for reminder_id, payload in claimed))
+    logger.info(f"Lote de lembretes: {len(done)} enviados, {len(failed)} falharam")
+
+
+async def dispatch_due() -> None:
+    """Tick do dispatcher: envia, em lotes, todos os lembretes vencidos reivindicados."""
+    task = asyncio.current_task()
+    _inflight.add(task)
+    try:
+        while not _draining:
+            claimed = await asyncio.to_thread(claim_due)
+            if claimed:
+                await _send_batch(claimed)
+            if len(claimed) < get_settings().reminders_batch_size:
+                break
+    finally:
+        _inflight.discard(task)
+
+
+async def drain(timeout: float) -> None:
+    """
+    Para de reivindicar novos lotes e aguarda os envios em andamento.
+
+    Lembretes ainda pendentes ficam para os outros workers (ou para a próxima
+    subida); claims interrompidos pelo timeout expiram após CLAIM_TTL.
+    """
+    global _draining
+    _draining = True
+    if _inflight:
+        logger.info(f"Aguardando {len(_inflight)} lote(s) de lembretes em andamento")
+        _, pending = await asyncio.wait(set(_inflight), timeout=timeout)
+        if pending:
+            logger.warning(f"{len(pending)} lote(s) de lembretes não terminaram a tempo")
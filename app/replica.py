@@ -0,0 +1,334 @@
+"""
+Réplica local (SQLite) do database de leads do Notion
+-----------------------------------------------------
+• Sincronização incremental em segundo plano: busca só as páginas editadas
+  desde a última sincronização (filtro por last_edited_time)
+• Índices em telefone, email e status + busca textual (FTS5) em nome,
+  email, telefone, profissão e motivação
+• Serve a resolução de telefone do webhook do Cal.com e o endpoint /leads
+  sem gastar cota da API do Notion
+• Com vários workers, só quem obtém o lease de sincronização consulta o
+  Notion (o lease é renovado a cada bloco gravado); os demais apenas leem a
+  réplica. No mesmo processo, as sincronizações incremental e completa
+  nunca rodam juntas, e as leituras no Notion passam por um limitador de taxa
+
+Obs.: páginas arquivadas no Notion não aparecem nas consultas incrementais;
+a sincronização completa (`sync(full=True)`, agendada a cada
+REPLICA_FULL_SYNC_HOURS ou via `python -m app.replica --full`) remove da
+réplica as páginas que não vieram na varredura.
+
+Variáveis de ambiente opcionais (lidas via app/config.py)
+----------------------------------------------------------
+REPLICA_DB               : caminho do arquivo SQLite (padrão leads.db)
+REPLICA_SYNC_SECONDS     : intervalo entre sincronizações (padrão 60)
+REPLICA_FULL_SYNC_HOURS  : intervalo entre sincronizações completas (padrão 24)
+REPLICA_RATE             : consultas por segundo ao Notion (padrão 3)
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from . import clients, notion, routing
+from .config import get_settings
+from .reminders import WORKER_ID
+
+logger = logging.getLogger("replica")
+
+CHUNK_SIZE = 100
+
+# Serializa as sincronizações deste processo (o lease só separa workers)
+_sync_lock = asyncio.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Abre uma conexão em modo autocommit (as transações são explícitas)."""
+    conn = sqlite3.connect(get_settings().replica_db, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def _digits(phone: str) -> str:
+    return "".join(filter(str.isdigit, phone or ""))
+
+
+def init_db() -> None:
+    """Cria as tabelas da réplica, se ainda não existirem."""
+    with closing(_connect()) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS leads (
+                page_id      TEXT PRIMARY KEY,
+                nome         TEXT,
+                telefone     TEXT,
+                telefone_num TEXT,
+                email        TEXT,
+                status       TEXT,
+                nivel        TEXT,
+                last_edited  TEXT,
+                properties   TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_leads_telefone ON leads (telefone_num);
+            CREATE INDEX IF NOT EXISTS idx_leads_email ON leads (email);
+            CREATE INDEX IF NOT EXISTS idx_leads_status ON leads (status);
+            CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5 (
+                page_id UNINDEXED, nome, email, telefone, profissao, motivo
+            );
+            CREATE TABLE IF NOT EXISTS replica_meta (
+                key    TEXT PRIMARY KEY,
+                value  TEXT,
+                expira REAL
+            );
+            """
+        )
+
+
+# Sincronização --------------------------------------------------------
+
+def _acquire_lease(ttl: float) -> bool:
+    """Tenta obter (ou renovar) o lease de sincronização para este worker."""
+    now = time.time()
+    with closing(_connect()) as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO replica_meta (key, value, expira) VALUES ('sync_lease', ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value, expira = excluded.expira
+            WHERE replica_meta.value = excluded.value OR replica_meta.expira <= ?
+            """,
+            (WORKER_ID, now + ttl, now),
+        )
+        return cur.rowcount == 1
+
+
+def _get_cursor() -> Optional[str]:
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT value FROM replica_meta WHERE key = 'cursor'").fetchone()
+    return row["value"] if row else None
+
+
+def _row(page: Dict) -> tuple:
+    props = page.get("properties", {})
+    email = (props.get("Email", {}).get("email") or "").lower()
+    status = (props.get("Status", {}).get("select") or {}).get("name", "")
+    telefone = notion.extract_rich_text_value(props, "Telefone")
+    return (
+        page["id"],
+        notion.extract_title_value(props, "Cliente"),
+        telefone,
+        _digits(telefone),
+        email,
+        status,
+        routing.nivel_do_lead(props),
+        page.get("last_edited_time", ""),
+        json.dumps(props, separators=(",", ":")),
+        notion.extract_rich_text_value(props, "Profissão"),
+        notion.extract_rich_text_value(props, "Real Motivação"),
+    )
+
+
+def _store(pages: List[Dict], cursor: Optional[str] = None) -> None:
+    """Grava um bloco de páginas (e o cursor, se informado) numa única transação."""
+    rows = [_row(page) for page in pages]
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO leads
+                (page_id, nome, telefone, telefone_num, email, status, nivel, last_edited, properties)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [row[:9] for row in rows],
+        )
+        conn.executemany("DELETE FROM leads_fts WHERE page_id = ?", [(row[0],) for row in rows])
+        conn.executemany(
+            "INSERT INTO leads_fts (page_id, nome, email, telefone, profissao, motivo) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(row[0], row[1], row[4], row[2], row[9], row[10]) for row in rows],
+        )
+        if cursor is not None:
+            conn.execute(
+                """
+                INSERT INTO replica_meta (key, value) VALUES ('cursor', ?)
+                ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+                """,
+                (cursor,),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def _prune(seen: List[str], iniciado_em: str) -> int:
+    """Remove, numa única transação, as páginas que a varredura completa não
+    trouxe (arquivadas/excluídas). Páginas gravadas depois do início da
+    varredura (ex.: `store_page`) são preservadas."""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (page_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM seen")
+        conn.executemany("INSERT OR IGNORE INTO seen (page_id) VALUES (?)", [(p,) for p in seen])
+        removidas = [
+            row["page_id"] for row in conn.execute(
+                "SELECT page_id FROM leads WHERE last_edited < ? "
+                "AND page_id NOT IN (SELECT page_id FROM seen)",
+                (iniciado_em,),
+            )
+        ]
+        conn.executemany("DELETE FROM leads WHERE page_id = ?", [(p,) for p in removidas])
+        conn.executemany("DELETE FROM leads_fts WHERE page_id = ?", [(p,) for p in removidas])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return len(removidas)
+
+
+async def sync(full: bool = False) -> int:
+    """
+    Traz para a réplica as páginas editadas desde a última sincronização.
+
+    Com `full=True` varre o database inteiro e, só ao final da varredura
+    completa, remove as páginas que não vieram (uma falha no meio não
+    trunca a réplica).
+
+    Returns:
+        int: Número de páginas gravadas (0 se outro worker detém o lease ou
+             se uma sincronização completa já está em andamento)
+    """
+    # Uma incremental durante a completa seria redundante: fica para o próximo tick
+    if _sync_lock.locked() and not full:
+        return 0
+    async with _sync_lock:
+        return await _sync(full)
+
+
+async def _sync(full: bool) -> int:
+    settings = get_settings()
+    ttl = settings.replica_sync_seconds * 3
+    if not await asyncio.to_thread(_acquire_lease, ttl):
+        return 0
+
+    # Arredondado ao minuto, como o last_edited_time do Notion
+    iniciado_em = time.strftime("%Y-%m-%dT%H:%M:00.000Z", time.gmtime())
+    cursor = None if full else await asyncio.to_thread(_get_cursor)
+    filtro = None
+    if cursor:
+        # last_edited_time tem granularidade de minuto: on_or_after reprocessa
+        # algumas páginas, mas o upsert é idempotente
+        filtro = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}}
+
+    # Ordem crescente de edição: o cursor gravado a cada bloco nunca passa à
+    # frente de páginas ainda não lidas, mesmo se a paginação falhar no meio
+    sorts = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+    total, bloco, novo_cursor, seen = 0, [], cursor or "", []
+    limiter = clients.RateLimiter(settings.replica_rate)
+    async for page in notion.iter_database(filter=filtro, sorts=sorts, limiter=limiter):
+        bloco.append(page)
+        if full:
+            seen.append(page["id"])
+        novo_cursor = max(novo_cursor, page.get("last_edited_time", ""))
+        if len(bloco) >= CHUNK_SIZE:
+            await asyncio.to_thread(_store, bloco, novo_cursor)
+            total, bloco = total + len(bloco), []
+            # Varreduras longas (completa) não podem deixar o lease expirar
+            if not await asyncio.to_thread(_acquire_lease, ttl):
+                logger.warning(f"Lease de sincronização perdido após {total} página(s); interrompendo")
+                return total
+    if bloco:
+        await asyncio.to_thread(_store, bloco, novo_cursor)
+        total += len(bloco)
+
+    if full:
+        removidas = await asyncio.to_thread(_prune, seen, iniciado_em)
+        logger.info(f"Sincronização completa: {removidas} página(s) removida(s) da réplica")
+    if total:
+        logger.info(f"Réplica sincronizada: {total} página(s) até {novo_cursor}")
+    return total
+
+
+def store_page(page: Dict) -> None:
+    """Grava na réplica uma página recém-criada/alterada pela própria aplicação,
+    sem esperar a próxima sincronização (não avança o cursor)."""
+    _store([page])
+
+
+# Leitura --------------------------------------------------------------
+
+def phone_for_email(email: str) -> str:
+    """Telefone do lead com o email informado ("" se não estiver na réplica)."""
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT telefone FROM leads WHERE email = ? AND telefone != '' "
+            "ORDER BY last_edited DESC LIMIT 1",
+            ((email or "").lower(),),
+        ).fetchone()
+    return row["telefone"] if row else ""
+
+
+def lead_by_phone(phone: str) -> Optional[Dict]:
+    """Lead com o telefone informado (compara só os dígitos)."""
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT page_id, nome, telefone, email, status, nivel FROM leads "
+            "WHERE telefone_num = ? ORDER BY last_edited DESC LIMIT 1",
+            (_digits(phone),),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def search(q: str = "", status: str = "", limit: int = 50) -> List[Dict]:
+    """Busca textual (prefixo por termo) com filtro opcional de status."""
+    termos = [t.replace('"', "") for t in (q or "").split()]
+    termos = [t for t in termos if t]
+    sql = "SELECT l.page_id, l.nome, l.telefone, l.email, l.status, l.nivel, l.last_edited FROM leads l"
+    params: list = []
+    where = []
+    if termos:
+        sql += " JOIN leads_fts f ON f.page_id = l.page_id"
+        where.append("leads_fts MATCH ?")
+        params.append(" ".join(f'"{t}"*' for t in termos))
+    if status:
+        where.append("l.status = ?")
+        params.append(status)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY l.last_edited DESC LIMIT ?"
+    params.append(limit)
+    with closing(_connect()) as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sincroniza a réplica local do Notion")
+    parser.add_argument("--full", action="store_true", help="varredura completa (remove páginas arquivadas)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    async def _main() -> int:
+        try:
+            init_db()
+            return await sync(full=args.full)
+        finally:
+            await clients.close()
+
+    logger.info(f"Concluído: {asyncio.run(_main())} página(s) gravada(s)")
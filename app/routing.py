@@ -0,0 +1,113 @@
+"""
+Roteamento entre regras locais e LLMs
+-------------------------------------
+• Classificação: regras locais primeiro; o LLM só é chamado quando nenhuma
+  regra casou (entrada ambígua), em micro‑lotes (ver app/batcher.py)
+• Modelo escolhido pelo nível do lead: gpt‑4 só para "Alto", modelo barato
+  para "Médio" e "Baixo"
+• Cada decisão é medida (rota, modelo, latência) e exposta em /routing/stats
+
+Variáveis de ambiente opcionais (lidas via app/config.py)
+----------------------------------------------------------
+OPENAI_MODEL        : modelo da classificação ambígua (padrão gpt-3.5-turbo)
+OPENAI_MODEL_ALTO   : modelo dos resumos de leads "Alto" (padrão gpt-4)
+OPENAI_MODEL_MEDIO  : modelo dos resumos de leads "Médio" (padrão gpt-3.5-turbo)
+OPENAI_MODEL_BAIXO  : modelo dos resumos de leads "Baixo" (padrão gpt-3.5-turbo)
+CLASSIFY_BATCH_WINDOW_MS : janela de acumulação do micro‑lote (padrão 30)
+CLASSIFY_BATCH_MAX       : itens por micro‑lote (padrão 20)
+"""
+
+import logging
+import os
+import statistics
+import time
+from collections import defaultdict, deque
+from typing import Dict
+
+from . import chatgpt
+from .batcher import ClassificationBatcher
+from .classifier import classificar_regras
+from .config import get_settings
+
+logger = logging.getLogger("routing")
+
+
+class RoutingStats:
+    """Contadores e latências (janela das últimas 1000 amostras) por etapa e rota."""
+
+    def __init__(self, window: int = 1000):
+        self.counts = defaultdict(int)
+        self.latencies = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, etapa: str, rota: str, inicio: float) -> None:
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        self.counts[(etapa, rota)] += 1
+        self.latencies[(etapa, rota)].append(latencia_ms)
+        logger.debug(f"{etapa} → {rota} em {latencia_ms:.0f} ms")
+
+    def snapshot(self) -> Dict:
+        resultado = {"lotes_classificacao": batcher.snapshot()}
+        for (etapa, rota), total in self.counts.items():
+            amostras = sorted(self.latencies[(etapa, rota)])
+            resultado.setdefault(etapa, {})[rota] = {
+                "total": total,
+                "latencia_mediana_ms": round(statistics.median(amostras), 1),
+                "latencia_p95_ms": round(amostras[int(0.95 * (len(amostras) - 1))], 1),
+            }
+        return resultado
+
+
+stats = RoutingStats()
+
+batcher = ClassificationBatcher(
+    model=get_settings().classify_model,
+    window_ms=get_settings().classify_batch_window_ms,
+    max_items=get_settings().classify_batch_max,
+)
+
+
+def modelo_para_nivel(nivel: str) -> str:
+    """Modelo usado para leads do nível informado (nível desconhecido → Médio)."""
+    settings = get_settings()
+    modelos = {"Alto": settings.model_alto, "Médio": settings.model_medio, "Baixo": settings.model_baixo}
+    return modelos.get(nivel, settings.model_medio)
+
+
+def nivel_do_lead(properties: Dict) -> str:
+    """Extrai o "Nível de Qualificação" das propriedades de uma página do Notion."""
+    prop = properties.get("Nível de Qualificação", {})
+    if prop.get("type") == "multi_select" and prop.get("multi_select"):
+        return prop["multi_select"][0]["name"]
+    if prop.get("type") == "select" and prop.get("select"):
+        return prop["select"]["name"]
+    return ""
+
+
+async def classificar_lead(indicacao: str, motivo: str) -> str:
+    """Classifica pelas regras; consulta o LLM apenas se a entrada for ambígua."""
+    inicio = time.perf_counter()
+    nivel, confiante = classificar_regras(indicacao, motivo)
+    if confiante or not get_settings().openai_api_key:
+        stats.record("classificacao", "regras", inicio)
+        return nivel
+
+    resultado = await batcher.classify(indicacao, motivo)
+    if resultado:
+        stats.record("classificacao", f"llm:{batcher.model}", inicio)
+        return resultado
+
+    stats.record("classificacao", "regras (fallback)", inicio)
+    return nivel
+
+
+async def gerar_resumo_vendas(lead_data: Dict) -> str:
+    """Gera o resumo para a equipe de vendas com o modelo do nível do lead."""
+    inicio = time.perf_counter()
+    modelo = modelo_para_nivel(nivel_do_lead(lead_data))
+    mensagem = await chatgpt.generate_sales_message(lead_data, model=modelo)
+    if mensagem:
+        stats.record("resumo", f"llm:{modelo}", inicio)
+        return mensagem
+
+    stats.record("resumo", "mensagem padrão (fallback)", inicio)
+    return chatgpt.fallback_sales_message(lead_data)
@@ -1,31 +1,25 @@
-import os
 import httpx
 import logging
 from datetime import datetime
-from .chatgpt import generate_sales_message
+from . import clients
+from .config import get_settings
+from .routing import gerar_resumo_vendas
 
-# Configuração do logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('whatsapp_service')
 
-INSTANCE_ID = os.getenv("ZAPI_INSTANCE")
-TOKEN = os.getenv("ZAPI_TOKEN")
-CLIENT_TOKEN = os.getenv("ZAPI_CLIENT_TOKEN")
+ZAPI_TIMEOUT = 30
 
-# Números da equipe de vendas
-SALES_TEAM_PHONES = ["5511975578651", "5511957708562", "5511955911993"]
-
-HEADERS = {
-    "Content-Type": "application/json",
-    "Client-Token": CLIENT_TOKEN
-}
-
-BASE_URL = f"https://api.z-api.io/instances/{INSTANCE_ID}/token/{TOKEN}"
+def _headers() -> dict:
+    """Cabeçalhos da Z-API"""
+    return {
+        "Content-Type": "application/json",
+        "Client-Token": get_settings().zapi_client_token
+    }
 
-logger.info(f"WhatsApp Service initialized with instance {INSTANCE_ID}")
+def _base_url() -> str:
+    """URL base da instância Z-API"""
+    settings = get_settings()
+    return f"https://api.z-api.io/instances/{settings.zapi_instance}/token/{settings.zapi_token}"
 
 async def send_message(phone: str, message: str) -> dict:
     """
@@ -45,7 +39,7 @@ async def send_message(phone: str, message: str) -> dict:
     logger.debug(f"Número formatado: {clean_phone}")
     
     # Endpoint para envio de mensagem de texto
-    url = f"{BASE_URL}/send-text"
+    url = f"{_base_url()}/send-text"
     
     payload = {
         "phone": clean_phone,
@@ -58,12 +52,13 @@ async def send_message(phone: str, message: str) -> dict:
         logger.debug(f"Fazendo requisição para {url}")
         logger.debug(f"Payload: {payload}")
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, json=payload, headers=HEADERS)
-            response.raise_for_status()
-            result = response.json()
-            logger.info(f"Mensagem enviada com sucesso. messageId: {result.get('messageId')}")
-            return result
+        response = await clients.get().post(
+            url, json=payload, headers=_headers(), timeout=ZAPI_TIMEOUT
+        )
+        response.raise_for_status()
+        result = response.json()
+        logger.info(f"Mensagem enviada com sucesso. messageId: {result.get('messageId')}")
+        return result
     except httpx.HTTPError as e:
         logger.error(f"Erro HTTP ao enviar mensagem: {str(e)}")
         logger.error(f"Status code: {e.response.status_code if hasattr(e, 'response') else 'N/A'}")
@@ -108,7 +103,7 @@ async def send_link_message(
     full_message = f"{message}\n{link_url}" if add_link_to_message else message
     
     # Endpoint para envio de link
-    url = f"{BASE_URL}/send-link"
+    url = f"{_base_url()}/send-link"
     
     payload = {
         "phone": clean_phone,
@@ -126,12 +121,13 @@ async def send_link_message(
         logger.debug(f"Fazendo requisição para {url}")
         logger.debug(f"Payload: {payload}")
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, json=payload, headers=HEADERS)
-            response.raise_for_status()
-            result = response.json()
-            logger.info(f"Mensagem com link enviada com sucesso. messageId: {result.get('messageId')}")
-            return result
+        response = await clients.get().post(
+            url, json=payload, headers=_headers(), timeout=ZAPI_TIMEOUT
+        )
+        response.raise_for_status()
+        result = response.json()
+        logger.info(f"Mensagem com link enviada com sucesso. messageId: {result.get('messageId')}")
+        return result
     except httpx.HTTPError as e:
         logger.error(f"Erro HTTP ao enviar mensagem com link: {str(e)}")
         logger.error(f"Status code: {e.response.status_code if hasattr(e, 'response') else 'N/A'}")
@@ -191,7 +187,7 @@ async def notify_booking(name: str, start_time: str, meet_link: str, notion_data
         # Mensagem detalhada para a equipe de vendas
         if notion_data:
             logger.info("Gerando mensagem para equipe de vendas")
-            sales_message = await generate_sales_message(notion_data)
+            sales_message = await gerar_resumo_vendas(notion_data)
             
             # Adiciona informações da reunião à análise
             full_sales_message = (
@@ -204,7 +200,7 @@ async def notify_booking(name: str, start_time: str, meet_link: str, notion_data
             )
             
             logger.debug("Iniciando envio para equipe de vendas")
-            for sales_phone in SALES_TEAM_PHONES:
+            for sales_phone in get_settings().sales_team_phones:
                 logger.debug(f"Enviando para vendedor: {sales_phone}")
                 await send_link_message(
                     phone=sales_phone,
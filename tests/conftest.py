@@ -0,0 +1,16 @@
+import pytest
+
+from app.config import get_settings
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """Define variáveis de ambiente e relê a configuração: env(REMINDERS_RATE=1000)."""
+    def aplicar(**valores):
+        for nome, valor in valores.items():
+            monkeypatch.setenv(nome, str(valor))
+        get_settings.cache_clear()
+        return get_settings()
+
+    yield aplicar
+    get_settings.cache_clear()
@@ -0,0 +1,26 @@
+"""Regras locais de classificação (sem LLM)."""
+
+import pytest
+
+from app.classifier import classificar_regras
+
+
+@pytest.mark.parametrize("motivo, esperado", [
+    ("Perdi meu trabalho mês passado", ("Alto", True)),
+    ("fui demitida do meu emprego", ("Alto", True)),
+    ("estou perdendo o trabalho", ("Alto", True)),
+    ("Quero viajar para o Canadá", ("Alto", True)),
+    ("quero aprimorar e manter o inglês", ("Médio", True)),
+    ("quero aprimorar", ("Baixo", True)),
+    # Não são perda de emprego: ficam para o LLM
+    ("perdi prazo no trabalho", ("Baixo", False)),
+    ("perdão, mas quero um emprego novo", ("Baixo", False)),
+    ("tenho medo de perder clientes no meu trabalho", ("Baixo", False)),
+    ("", ("Baixo", True)),
+])
+def test_classificar_regras_com_indicacao(motivo, esperado):
+    assert classificar_regras("Maria", motivo) == esperado
+
+
+def test_perda_de_trabalho_sem_indicacao_nao_e_alto():
+    assert classificar_regras("", "perdi meu trabalho") == ("Baixo", False)
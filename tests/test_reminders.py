@@ -0,0 +1,144 @@
+"""Claim atômico, expiração/novas tentativas e cancelamento dos lembretes."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import reminders
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path, env):
+    settings = env(REMINDERS_DB=tmp_path / "reminders.db", REMINDERS_RATE=1000)
+    reminders.init_db()
+    return settings
+
+
+def _agendar(n: int, atraso: float = -60) -> None:
+    run_at = datetime.now() + timedelta(seconds=atraso)
+    for i in range(n):
+        reminders.schedule(f"r{i}", run_at, name=f"Lead {i}", start_time="", meet_link="")
+
+
+def _linha(reminder_id: str):
+    with closing(reminders._connect()) as conn:
+        return conn.execute("SELECT * FROM reminders WHERE id = ?", (reminder_id,)).fetchone()
+
+
+def test_claim_unico_entre_conexoes_concorrentes():
+    _agendar(50)
+
+    def reivindicar(_) -> list:
+        return [reminder_id for reminder_id, _ in reminders.claim_due(limit=7)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        lotes = list(pool.map(reivindicar, range(16)))
+
+    ids = [reminder_id for lote in lotes for reminder_id in lote]
+    assert len(ids) == len(set(ids)) == 50
+    assert reminders.claim_due() == []
+
+
+def test_lembrete_futuro_nao_e_reivindicado():
+    _agendar(1, atraso=3600)
+    assert reminders.claim_due() == []
+    assert _linha("r0")["status"] == "pending"
+
+
+def test_claim_expirado_e_retomado_ate_max_attempts(settings):
+    _agendar(1)
+    agora = time.time()
+    for tentativa in range(1, settings.reminders_max_attempts + 1):
+        assert [i for i, _ in reminders.claim_due(now=agora)] == ["r0"]
+        assert _linha("r0")["attempts"] == tentativa
+        # Dentro do TTL ninguém mais o reivindica
+        assert reminders.claim_due(now=agora + 1) == []
+        agora += settings.reminders_claim_ttl + 1
+
+    assert reminders.claim_due(now=agora) == []
+    assert _linha("r0")["status"] == "failed"
+
+
+def test_mark_failed_devolve_a_fila_e_falha_apos_max_attempts(settings):
+    _agendar(1)
+    maximo = settings.reminders_max_attempts
+    for tentativa in range(1, maximo + 1):
+        assert len(reminders.claim_due(now=time.time() + settings.reminders_poll_seconds + 1)) == 1
+        reminders.mark_failed(["r0"])
+        esperado = "failed" if tentativa == maximo else "pending"
+        assert _linha("r0")["status"] == esperado
+
+
+def test_mark_done_so_remove_claims_do_proprio_worker(monkeypatch):
+    _agendar(1)
+    monkeypatch.setattr(reminders, "WORKER_ID", "outro")
+    reminders.claim_due()
+    monkeypatch.setattr(reminders, "WORKER_ID", "este")
+    reminders.mark_done(["r0"])
+    assert _linha("r0")["status"] == "claimed"
+
+
+def test_cancel_remove_pendente_mas_nao_claim_em_andamento():
+    _agendar(2)
+    reminders.cancel("r0")
+    assert _linha("r0") is None
+
+    reminders.claim_due()
+    reminders.cancel("r1")
+    assert _linha("r1")["status"] == "claimed"
+
+
+def test_reagendar_reinicia_tentativas():
+    _agendar(1)
+    reminders.claim_due()
+    _agendar(1, atraso=3600)
+    linha = _linha("r0")
+    assert (linha["status"], linha["attempts"], linha["claimed_by"]) == ("pending", 0, None)
+
+
+def test_lote_interrompido_nao_deixa_enviados_como_claimed(monkeypatch, env):
+    _agendar(10)
+    env(REMINDERS_CONCURRENCY=1)
+    enviados = []
+
+    async def send_reminder(name, **_):
+        if len(enviados) == 4:
+            await asyncio.Event().wait()  # trava até o cancelamento
+        enviados.append(name)
+
+    monkeypatch.setattr(reminders.whatsapp, "send_reminder", send_reminder)
+
+    async def tick():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(reminders._send_batch(reminders.claim_due()), timeout=0.5)
+
+    asyncio.run(tick())
+    with closing(reminders._connect()) as conn:
+        restantes = conn.execute("SELECT COUNT(*) FROM reminders WHERE status = 'claimed'").fetchone()[0]
+    assert len(enviados) == 4
+    assert restantes == 6
+
+
+def test_drain_aguarda_o_lote_em_andamento(monkeypatch, env):
+    _agendar(10)
+    env(REMINDERS_CONCURRENCY=2)
+    monkeypatch.setattr(reminders, "_draining", False)
+
+    async def send_reminder(**_):
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(reminders.whatsapp, "send_reminder", send_reminder)
+
+    async def shutdown():
+        task = asyncio.create_task(reminders.dispatch_due())
+        await asyncio.sleep(0.1)
+        await reminders.drain(timeout=5)
+        assert task.done()
+
+    asyncio.run(shutdown())
+    with closing(reminders._connect()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 0
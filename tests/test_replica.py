@@ -0,0 +1,86 @@
+"""Sincronização da réplica: remoção atômica, serialização e lease."""
+
+import asyncio
+from contextlib import closing
+
+import pytest
+
+from app import replica
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, env):
+    env(REPLICA_DB=tmp_path / "leads.db", REPLICA_RATE=1000)
+    replica.init_db()
+
+
+def _page(i: int, editada: str = "2024-01-01T00:00:00.000Z") -> dict:
+    return {
+        "id": f"p{i}",
+        "last_edited_time": editada,
+        "properties": {
+            "Telefone": {"type": "rich_text", "rich_text": [{"text": {"content": f"55119{i:08d}"}}]},
+        },
+    }
+
+
+def _fake_notion(monkeypatch, pages: list, pausa: float = 0) -> list:
+    chamadas = []
+
+    async def iter_database(filter=None, sorts=None, limiter=None, **_):
+        chamadas.append(filter)
+        for page in pages:
+            if pausa:
+                await asyncio.sleep(pausa)
+            yield page
+
+    monkeypatch.setattr(replica.notion, "iter_database", iter_database)
+    return chamadas
+
+
+def _contar() -> int:
+    with closing(replica._connect()) as conn:
+        return conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+
+def test_sync_completo_remove_so_ao_final_e_preserva_paginas_novas(monkeypatch):
+    _fake_notion(monkeypatch, [_page(i) for i in range(250)])
+    assert asyncio.run(replica.sync()) == 250
+
+    replica.store_page(_page(999, "2999-01-01T00:00:00.000Z"))
+    _fake_notion(monkeypatch, [_page(i) for i in range(10)])
+    assert asyncio.run(replica.sync(full=True)) == 10
+    assert _contar() == 11
+    assert replica.lead_by_phone("5511900000999")["page_id"] == "p999"
+
+
+def test_falha_no_meio_do_sync_completo_nao_apaga_nada(monkeypatch):
+    _fake_notion(monkeypatch, [_page(i) for i in range(250)])
+    asyncio.run(replica.sync())
+
+    async def falha(**_):
+        yield _page(0)
+        raise RuntimeError("502")
+
+    monkeypatch.setattr(replica.notion, "iter_database", falha)
+    with pytest.raises(RuntimeError):
+        asyncio.run(replica.sync(full=True))
+    assert _contar() == 250
+
+
+def test_incremental_nao_roda_durante_o_completo(monkeypatch):
+    chamadas = _fake_notion(monkeypatch, [_page(i) for i in range(5)], pausa=0.01)
+
+    async def ambos():
+        return await asyncio.gather(replica.sync(full=True), replica.sync())
+
+    assert asyncio.run(ambos()) == [5, 0]
+    assert len(chamadas) == 1
+
+
+def test_lease_perdido_interrompe_a_varredura(monkeypatch):
+    _fake_notion(monkeypatch, [_page(i) for i in range(300)])
+    respostas = iter([True, False])
+    monkeypatch.setattr(replica, "_acquire_lease", lambda ttl: next(respostas))
+    assert asyncio.run(replica.sync(full=True)) == replica.CHUNK_SIZE
+    assert _contar() == replica.CHUNK_SIZE